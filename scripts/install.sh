@@ -53,7 +53,7 @@ chmod +x "$INSTALL_DIR/wrapper.sh"
 echo "🐍 Checking for Python (required for --viz tools)..."
 if command -v python3 >/dev/null 2>&1; then
     echo "   -> Python 3 detected."
-    echo "   -> Installing dependencies (textual, pywebview)..."
+    echo "   -> Installing dependencies (textual, pywebview, orjson)..."
 
     # Try standard install, then try with 'bypass' flags for macOS/Modern Linux
     if ! pip3 install -r "$INSTALL_DIR/tools/requirements.txt" > /dev/null 2>&1; then
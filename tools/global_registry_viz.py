@@ -3,11 +3,48 @@ import os
 import sys
 import atexit
 import traceback
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
 from textual.app import App, ComposeResult
 from textual.widgets import Header, Footer, DataTable, Input
 from textual.containers import Container
 from textual.binding import Binding
 
+# Optional: orjson parses the registry considerably faster; fall back to the stdlib if missing.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Optional: ijson streams very large registries entry by entry instead of loading the whole document.
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so it is covered by the first entry.
+JSON_ERRORS = (json.JSONDecodeError, ijson.JSONError) if ijson else (json.JSONDecodeError,)
+
+# Registry files at least this large (in bytes) are streamed with ijson when it is available.
+STREAM_THRESHOLD = 16 * 1024 * 1024
+
+# Parsed registries shared by all browser instances: path -> (mtime_ns, rows, search_keys).
+# Entries are reused until the file's modification time changes.
+_REGISTRY_CACHE = {}
+
+# Seconds the search input must be idle before the table is re-filtered.
+FILTER_DEBOUNCE = 0.05
+
+# Recent search results are kept for reuse (e.g. when backspacing) until they hold more than
+# this many times the registry's row count in total, so short, broad queries cannot pile up copies.
+FILTER_CACHE_ROWS_FACTOR = 4
+
+# When a query narrows the results, at most this many rows are removed in place (keeping the cursor).
+# DataTable.remove_row re-indexes the whole table on every call (Textual 8.2), so each removal costs about
+# 1/20 of a clear() + add_rows() rebuild at any table size. Measured for 20 removals vs. a rebuild:
+# 500 rows 8.4 vs 7.6 ms, 2000 rows 31.7 vs 32.4 ms, 5000 rows 85.1 vs 80.6 ms. Larger changes rebuild.
+MAX_INCREMENTAL_REMOVALS = 15
+
 # ==================================================================================================
 # WIDGET: Registry Browser
 # Displays the registry data in a searchable table.
@@ -17,6 +54,10 @@ class RegistryBrowser(Container):
         super().__init__(**kwargs)
         self.json_path = json_path
         self.raw_data = [] # Stores the full dataset for filtering
+        self.search_keys = [] # Lowercased search text per row (parallel to raw_data)
+        self._filter_timer = None # Pending debounced filter pass
+        self._row_keys = [] # Table row keys of the rows currently shown (parallel to _last_filtered)
+        self._reset_filter_cache()
 
     def compose(self) -> ComposeResult:
         # 1. Search Bar
@@ -40,70 +81,214 @@ class RegistryBrowser(Container):
         # Removed broad try/except to allow errors to surface
         table = self.query_one("#reg_table", DataTable)
         table.clear()
+        self.raw_data = []
+        self.search_keys = []
+        self._row_keys = []
+        self._reset_filter_cache()
 
         # 1. File Existence Check
         if not os.path.exists(self.json_path):
             self.notify(f"JSON file not found: {self.json_path}", severity="warning")
             return
 
-        # 2. Parse JSON
+        # 2. Load Rows (reused across instances/reloads while the file is unchanged)
+        mtime = os.stat(self.json_path).st_mtime_ns
+        cached = _REGISTRY_CACHE.get(self.json_path)
+        if cached is not None and cached[0] == mtime:
+            _, rows, keys = cached
+        else:
+            rows, keys = self._read_rows()
+            _REGISTRY_CACHE[self.json_path] = (mtime, rows, keys)
+        self.raw_data, self.search_keys = rows, keys
+        self._reset_filter_cache()
+
+        # 3. Populate Table (single batch insert)
+        self._row_keys = table.add_rows(self.raw_data)
+
+    def _read_rows(self):
+        """Parses the registry file into sorted table rows and their search keys."""
+        # 1. Parse JSON & Build Rows
+        # Entries are reduced to table rows as they are parsed, so a streamed file is never held whole.
         # We keep specific exceptions for IO/JSON as they are expected runtime conditions
         try:
-            with open(self.json_path, 'r') as f:
-                data = json.load(f)
-        except json.JSONDecodeError as e:
+            entries = [((item.get('class', ''), item.get('method', '')), self._make_row(item))
+                       for item in self._iter_registry()]
+        except JSON_ERRORS as e:
             self.notify(f"Invalid JSON format: {e}", severity="error")
             raise # Re-raise to ensure visibility in logs/traceback if needed
         except IOError as e:
             self.notify(f"IO Error reading file: {e}", severity="error")
             raise
 
-        # 3. Validate Structure
+        # 2. Sort Data (Class -> Method)
+        # Removed try/except around sort to expose key errors or type errors
+        entries.sort(key=lambda entry: entry[0])
+
+        # 3. Index Rows
+        rows = [row for _, row in entries]
+        # Lowercase once here rather than on every keystroke; NUL keeps matches from spanning columns
+        keys = ["\x00".join(row).lower() for row in rows]
+        return rows, keys
+
+    def _iter_registry(self):
+        """Yields the registry entries, streaming large files through ijson when it is installed."""
+        if ijson and os.path.getsize(self.json_path) >= STREAM_THRESHOLD:
+            with open(self.json_path, 'rb') as f:
+                self._check_streamed_structure(ijson.parse(f))
+                # Rewind and stream unwrapped, so items are still built by ijson's C backend
+                f.seek(0)
+                yield from ijson.items(f, 'registry.item')
+            return
+
+        with open(self.json_path, 'rb') as f:
+            raw = f.read()
+        data = orjson.loads(raw) if orjson else json.loads(raw)
+
+        # Validate Structure
+        if not isinstance(data, dict):
+            raise self._structure_error("root must be an object")
         registry = data.get("registry", [])
         if not isinstance(registry, list):
-            self.notify("Invalid JSON structure: 'registry' key must be a list", severity="error")
-            raise ValueError("Invalid JSON structure: 'registry' key must be a list")
+            raise self._structure_error("'registry' key must be a list")
+        yield from registry
 
-        # 4. Sort Data (Class -> Method)
-        # Removed try/except around sort to expose key errors or type errors
-        registry.sort(key=lambda x: (x.get('class', ''), x.get('method', '')))
-
-        # 5. Populate Table
-        for item in registry:
-            # Removed per-row try/except to expose malformed data
-            
-            # Safe extraction with defaults is still good practice, 
-            # but if something is critically wrong (e.g. item is not a dict), we let it crash.
-            class_name = item.get('class', '<unknown>')
-            method_name = item.get('method', '<unknown>')
-            item_type = item.get('type', 'unknown')
-            return_type = item.get('return', 'void')
-            params = item.get('params', [])
-            
-            if not isinstance(params, list):
-                params = str(params) # Fallback if params is not a list
-
-            # Format the 'Type' column with icons
-            kind = "ƒ static" if item_type == 'function' else "ⓜ method"
-            if item_type == 'constructor': kind = "🔨 new"
-
-            row = (class_name, method_name, kind, return_type, str(params))
-            self.raw_data.append(row)
-            table.add_row(*row)
+    def _check_streamed_structure(self, events):
+        """Applies the whole-file path's structure checks to ijson parse events.
+
+        Stops at the first event of the 'registry' value (or the end of the root object); the
+        compiler writes 'registry' as the first key, so only a handful of events are read.
+        """
+        for prefix, event, _ in events:
+            # Root level: only the object itself and its keys
+            if prefix == '' and event not in ('start_map', 'map_key', 'end_map'):
+                raise self._structure_error("root must be an object")
+            if prefix == '' and event == 'end_map':
+                return # No 'registry' key: treated as empty, like data.get("registry", [])
+            # The 'registry' value itself must open an array
+            if prefix == 'registry':
+                if event != 'start_array':
+                    raise self._structure_error("'registry' key must be a list")
+                return
+
+    def _structure_error(self, message):
+        """Notifies the user about a malformed registry file and returns the error to raise."""
+        self.notify(f"Invalid JSON structure: {message}", severity="error")
+        return ValueError(f"Invalid JSON structure: {message}")
+
+    @staticmethod
+    def _make_row(item):
+        """Converts one registry entry into a table row."""
+        # Removed per-row try/except to expose malformed data
+
+        # Safe extraction with defaults is still good practice,
+        # but if something is critically wrong (e.g. item is not a dict), we let it crash.
+        class_name = item.get('class', '<unknown>')
+        method_name = item.get('method', '<unknown>')
+        item_type = item.get('type', 'unknown')
+        return_type = item.get('return', 'void')
+        params = item.get('params', [])
+
+        if not isinstance(params, list):
+            params = str(params) # Fallback if params is not a list
+
+        # Format the 'Type' column with icons
+        kind = "ƒ static" if item_type == 'function' else "ⓜ method"
+        if item_type == 'constructor': kind = "🔨 new"
+
+        return (class_name, method_name, kind, return_type, str(params))
+
+    def _reset_filter_cache(self):
+        """Drops all cached search results (called whenever raw_data changes)."""
+        self._last_query = ""
+        self._last_filtered = (self.search_keys, self.raw_data)
+        self._filter_cache = OrderedDict() # LRU: query -> (matching keys, matching rows)
+        self._filter_cache_rows = 0 # Total rows held by _filter_cache
+        self._empty_prefixes = [] # Sorted queries with no matches; none is a prefix of another
+
+    def _has_empty_prefix(self, query):
+        """True if some prefix of the query is already known to match nothing."""
+        # In a sorted, prefix-free list the only candidate prefix is the greatest entry <= query
+        i = bisect_right(self._empty_prefixes, query)
+        return i > 0 and query.startswith(self._empty_prefixes[i - 1])
+
+    def _add_empty_prefix(self, query):
+        """Records a query with no matches, dropping stored entries it makes redundant."""
+        i = bisect_left(self._empty_prefixes, query)
+        # Entries extending the query sort directly after it
+        j = i
+        while j < len(self._empty_prefixes) and self._empty_prefixes[j].startswith(query):
+            j += 1
+        self._empty_prefixes[i:j] = [query]
+
+    def _filter_rows(self, query):
+        """Returns the rows matching the (lowercased) query, reusing earlier results where possible."""
+        cached = self._filter_cache.get(query)
+        if not query:
+            # Everything matches; the full dataset is never copied into the cache
+            filtered = (self.search_keys, self.raw_data)
+        elif cached is not None:
+            self._filter_cache.move_to_end(query)
+            filtered = cached
+        elif self._has_empty_prefix(query):
+            # Any extension of a query with no matches has no matches either
+            filtered = ([], [])
+        else:
+            # Typed queries usually extend the previous one, so its matches are a superset of ours
+            if query.startswith(self._last_query):
+                keys, rows = self._last_filtered
+            else:
+                keys, rows = self.search_keys, self.raw_data
+
+            matches = [(key, row) for key, row in zip(keys, rows) if query in key]
+            filtered = ([key for key, _ in matches], [row for _, row in matches])
+            if not matches:
+                # Dead ends are answered by _empty_prefixes; caching them would add entries that
+                # hold no rows and so are never evicted by the row budget below.
+                self._add_empty_prefix(query)
+            else:
+                self._filter_cache[query] = filtered
+                self._filter_cache_rows += len(filtered[1])
+                while self._filter_cache_rows > FILTER_CACHE_ROWS_FACTOR * len(self.raw_data):
+                    _, (_, evicted) = self._filter_cache.popitem(last=False)
+                    self._filter_cache_rows -= len(evicted)
+
+        self._last_query, self._last_filtered = query, filtered
+        return filtered[1]
 
     def on_input_changed(self, event: Input.Changed):
         """Filters the table based on the search input."""
         # Removed broad try/except to allow errors to surface
         if event.input.id == "reg_search":
+            # Debounce: a burst of keystrokes only triggers one filter pass once typing settles
+            if self._filter_timer is not None:
+                self._filter_timer.stop()
             query = event.value.lower()
-            table = self.query_one("#reg_table", DataTable)
-            table.clear()
-            
-            # Re-populate table with matching rows
-            for row in self.raw_data:
-                # Safe search across all columns
-                if any(query in str(cell).lower() for cell in row):
-                    table.add_row(*row)
+            self._filter_timer = self.set_timer(FILTER_DEBOUNCE, lambda: self._do_filter(query))
+
+    def _do_filter(self, query):
+        """Re-populates the table with the rows matching the query."""
+        self._filter_timer = None
+        table = self.query_one("#reg_table", DataTable)
+        shown_rows = self._last_filtered[1]
+        narrowing = query.startswith(self._last_query)
+        rows = self._filter_rows(query)
+
+        # Narrowing: the matches are an ordered subset of the shown rows (same row objects),
+        # so the rows to drop can be found by walking both lists together.
+        if narrowing and len(shown_rows) - len(rows) <= MAX_INCREMENTAL_REMOVALS:
+            kept, i = [], 0
+            for row_key, row in zip(self._row_keys, shown_rows):
+                if i < len(rows) and rows[i] is row:
+                    kept.append(row_key)
+                    i += 1
+                else:
+                    table.remove_row(row_key)
+            self._row_keys = kept
+            return
+
+        # Re-populate table with matching rows in one batch
+        table.clear()
+        self._row_keys = table.add_rows(rows)
 
 # ==================================================================================================
 # APP: Registry Dashboard
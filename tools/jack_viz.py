@@ -4,24 +4,66 @@ import xml.etree.ElementTree as ET
 import json
 import webview
 
+# Optional: orjson serialises the AST payload much faster; fall back to the stdlib if missing.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 # 1. PARSER
-def parse_node(element):
-    tag = element.tag
-    text = element.text.strip() if element.text else ""
-    label = tag
-    if text: label += f": {text}"
-    style_map = {
-        "class": {"f": "#1f6feb", "s": "#388bfd"}, "subroutineDec": {"f": "#238636", "s": "#2ea043"},
-        "doStatement": {"f": "#8957e5", "s": "#a371f7"}, "letStatement": {"f": "#8957e5", "s": "#a371f7"},
-        "ifStatement": {"f": "#d29922", "s": "#e3b341"}, "whileStatement": {"f": "#d29922", "s": "#e3b341"},
-        "returnStatement": {"f": "#da3633", "s": "#f85149"}, "identifier": {"f": "#30363d", "s": "#6e7681"},
-        "symbol": {"f": "#30363d", "s": "#8b949e"}, "integerConstant": {"f": "#1f6feb", "s": "#58a6ff"},
-        "stringConstant": {"f": "#1f6feb", "s": "#58a6ff"}, "keyword": {"f": "#da3633", "s": "#f85149"},
-        "default": {"f": "#30363d", "s": "#6e7681"}
-    }
-    style = style_map.get(tag, style_map["default"])
-    return { "name": label, "fill": style["f"], "stroke": style["s"], "children": [parse_node(child) for child in element] }
+# Node colours by XML tag ("f" = fill, "s" = stroke); built once rather than per node.
+_STYLE_MAP = {
+    "class": {"f": "#1f6feb", "s": "#388bfd"}, "subroutineDec": {"f": "#238636", "s": "#2ea043"},
+    "doStatement": {"f": "#8957e5", "s": "#a371f7"}, "letStatement": {"f": "#8957e5", "s": "#a371f7"},
+    "ifStatement": {"f": "#d29922", "s": "#e3b341"}, "whileStatement": {"f": "#d29922", "s": "#e3b341"},
+    "returnStatement": {"f": "#da3633", "s": "#f85149"}, "identifier": {"f": "#30363d", "s": "#6e7681"},
+    "symbol": {"f": "#30363d", "s": "#8b949e"}, "integerConstant": {"f": "#1f6feb", "s": "#58a6ff"},
+    "stringConstant": {"f": "#1f6feb", "s": "#58a6ff"}, "keyword": {"f": "#da3633", "s": "#f85149"},
+    "default": {"f": "#30363d", "s": "#6e7681"}
+}
+
+# Integer style ids: a node stores _TAG_IDX[tag] and its colours are _FILLS[i] / _STROKES[i].
+# The two arrays are embedded once in the page rather than per file.
+_TAG_IDX = {tag: i for i, tag in enumerate(_STYLE_MAP)}
+_FILLS = [style["f"] for style in _STYLE_MAP.values()]
+_STROKES = [style["s"] for style in _STYLE_MAP.values()]
+_DEFAULT_IDX = _TAG_IDX["default"]
+
+def parse_tree(xml_path):
+    # Single streaming pass with an explicit stack (no recursion, so no depth limit on deep ASTs).
+    # The tree is emitted flat ("structure of arrays"): node i has label labels[names[i]], style id
+    # styles[i] (see _TAG_IDX) and parent parents[i] (-1 for the root). Ids are assigned in pre-order,
+    # so siblings keep their source order when the page rebuilds the hierarchy.
+    # Labels repeat heavily ("symbol: ;", "keyword: let", ...), so each distinct one is stored once.
+    names, styles, parents, labels = [], [], [], []
+    label_idx = {} # label -> index into labels
+    stack = [-1] # ids of the elements that are still open
+    for event, element in ET.iterparse(xml_path, events=("start", "end")):
+        if event == "start":
+            parents.append(stack[-1])
+            names.append(None)
+            styles.append(None)
+            stack.append(len(parents) - 1)
+            continue
+
+        # "end": the element's text is complete
+        node_id = stack.pop()
+        tag = element.tag
+        text = element.text.strip() if element.text else ""
+        label = tag
+        if text: label += f": {text}"
+        # Everything needed is extracted, so release the element's text and children right away;
+        # otherwise iterparse keeps the whole XML document alive until the pass ends.
+        element.clear()
+        name = label_idx.get(label)
+        if name is None:
+            name = label_idx[label] = len(labels)
+            labels.append(label)
+        names[node_id] = name
+        styles[node_id] = _TAG_IDX.get(tag, _DEFAULT_IDX)
+
+    return { "names": names, "styles": styles, "parents": parents, "labels": labels }
 
 
 # 2. LOCAL ASSET LOADER
@@ -38,7 +80,10 @@ def get_d3_script():
 
 # 3. HTML GENERATOR
 def get_html_content(files_payload, d3_script_tag):
-    json_str = json.dumps(files_payload)
+    json_str = orjson.dumps(files_payload).decode("utf-8") if orjson else json.dumps(files_payload)
+    # The payload sits in a <script> block, so "</script>" or "<!--" inside a label must not reach
+    # the HTML parser. "<" can only appear inside JSON strings, where \u003c is an equivalent escape.
+    safe_json = json_str.replace("<", "\\u003c")
     return f"""
 <!DOCTYPE html>
 <html>
@@ -90,11 +135,23 @@ def get_html_content(files_payload, d3_script_tag):
     </div>
     <canvas id="viz"></canvas>
 
+    <script id="payload" type="application/json">{safe_json}</script>
     <script>
-        const allFiles = {json_str};
+        const allFiles = JSON.parse(document.getElementById("payload").textContent);
+        const FILLS = {json.dumps(_FILLS)}, STROKES = {json.dumps(_STROKES)};
         let currentTransform = d3.zoomIdentity;
         const canvas = document.querySelector("#viz");
         const ctx = canvas.getContext("2d", {{ alpha: false }});
+
+        // Labels repeat heavily, so text widths are measured once per distinct label (font is fixed)
+        const NODE_FONT = "600 12px sans-serif";
+        const byX = d3.bisector(d => d.x);
+        const _wCache = new Map();
+        function widthFor(name) {{
+            let w = _wCache.get(name);
+            if (w === undefined) {{ w = ctx.measureText(name).width; _wCache.set(name, w); }}
+            return w;
+        }}
         
         // --- Populate Dropdown ---
         const select = document.getElementById("file-select");
@@ -106,9 +163,31 @@ def get_html_content(files_payload, d3_script_tag):
         }});
 
         function loadFile(index) {{
-            const root = d3.hierarchy(allFiles[index].tree);
+            // Rebuild the hierarchy from the flat arrays emitted by parse_tree
+            const t = allFiles[index].tree;
+            const nodes = t.names.map((name, i) => ({{
+                id: i, name: t.labels[name], fill: FILLS[t.styles[i]], stroke: STROKES[t.styles[i]]
+            }}));
+            const root = d3.stratify()
+                .id(d => d.id)
+                .parentId(d => t.parents[d.id] < 0 ? null : t.parents[d.id])(nodes);
             const treeLayout = d3.tree().nodeSize([40, 200]);
             treeLayout(root);
+
+            // Node geometry only changes with the tree, so compute it here instead of every frame
+            ctx.font = NODE_FONT;
+            root.each(d => {{
+                d.w = Math.max(120, widthFor(d.data.name) + 30);
+                d._x = d.y; d._y = d.x - 13;
+            }});
+            // Sorted by vertical position so draw can binary-search the visible slice
+            window.currentNodes = root.descendants().sort((a, b) => a.x - b.x);
+
+            // Links are static for a given tree: record them into one Path2D and replay it each frame
+            const linksPath = new Path2D();
+            const linkGen = d3.linkHorizontal().x(d => d.y).y(d => d.x).context(linksPath);
+            root.links().forEach(d => linkGen(d));
+            window.currentLinksPath = linksPath;
             window.currentRoot = root;
             
             // Reset zoom to nicely fit the new tree
@@ -120,7 +199,6 @@ def get_html_content(files_payload, d3_script_tag):
 
         function draw() {{
             if (!window.currentRoot) return;
-            const root = window.currentRoot;
             const width = canvas.width / window.devicePixelRatio;
             const height = canvas.height / window.devicePixelRatio;
             const k = currentTransform.k, tx = currentTransform.x, ty = currentTransform.y;
@@ -130,22 +208,20 @@ def get_html_content(files_payload, d3_script_tag):
             ctx.fillStyle = "#0d1117"; ctx.fillRect(0, 0, width, height);
             ctx.translate(tx, ty); ctx.scale(k, k);
 
-            ctx.beginPath(); ctx.strokeStyle = "#30363d"; ctx.lineWidth = 2;
-            const linkGen = d3.linkHorizontal().x(d => d.y).y(d => d.x).context(ctx);
-            root.links().forEach(d => linkGen(d));
-            ctx.stroke();
-
-            ctx.font = "600 12px sans-serif"; ctx.textBaseline = "middle"; ctx.lineWidth = 1.5;
-            root.descendants().forEach(d => {{
-                if (d.x * k + ty < -50 || d.x * k + ty > height + 50) return;
-                const w = Math.max(120, ctx.measureText(d.data.name).width + 30);
-                const h = 26, x = d.y, y = d.x - 13;
-                
-                ctx.beginPath(); ctx.roundRect(x, y, w, h, 6); 
+            ctx.strokeStyle = "#30363d"; ctx.lineWidth = 2;
+            ctx.stroke(window.currentLinksPath);
+
+            ctx.font = NODE_FONT; ctx.textBaseline = "middle"; ctx.lineWidth = 1.5;
+            // Only nodes with -50 <= d.x * k + ty <= height + 50 are on screen
+            const nodes = window.currentNodes;
+            const lo = byX.left(nodes, (-50 - ty) / k), hi = byX.right(nodes, (height + 50 - ty) / k);
+            for (let i = lo; i < hi; i++) {{
+                const d = nodes[i];
+                ctx.beginPath(); ctx.roundRect(d._x, d._y, d.w, 26, 6);
                 ctx.fillStyle = d.data.fill; ctx.fill();
                 ctx.strokeStyle = d.data.stroke; ctx.stroke();
-                if (k > 0.4) {{ ctx.fillStyle = "#fff"; ctx.fillText(d.data.name, x + 10, d.x + 1); }}
-            }});
+                if (k > 0.4) {{ ctx.fillStyle = "#fff"; ctx.fillText(d.data.name, d._x + 10, d.x + 1); }}
+            }}
             ctx.restore();
         }}
 
@@ -186,19 +262,13 @@ if __name__ == "__main__":
             continue
 
         try:
-            tree = ET.parse(xml_path)
-
             # Extract clean name: "Main_18293.xml" -> "Main.jack"
             raw_name = os.path.basename(xml_path)
             display_name = raw_name.split('_')[0] + ".jack" if "_" in raw_name else raw_name
 
-            root = tree.getroot()
-            if root is None:
-                raise ValueError("Empty XML root")
-
             files_payload.append({
                 "filename": display_name,
-                "tree": parse_node(root)
+                "tree": parse_tree(xml_path)
             })
 
         except ET.ParseError as e: